@@ -3,33 +3,81 @@ import numpy as np
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 from statsmodels.tsa.stattools import adfuller
 from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
+import matplotlib
+matplotlib.use('Agg')  # off-screen rendering, safe inside joblib workers
 import matplotlib.pyplot as plt
 import logging
 from datetime import timedelta
+from joblib import Parallel, delayed
+from numba import njit, prange
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Enable line simplification so long series are cheap to rasterize
+plt.rcParams['path.simplify'] = True
+plt.rcParams['path.simplify_threshold'] = 1.0
+plt.rcParams['agg.path.chunksize'] = 10000
+
+# Shared figures, created once per process and cleared between stations
+trend_fig, trend_ax = plt.subplots(figsize=(12, 6))
+panel_fig, panel_axes = plt.subplots(2, 2, figsize=(16, 10))
+
 # Step 1: Define AQI calculation function based on India's CPCB breakpoints
+@njit(parallel=True, cache=True)
+def _aqi_kernel(pm, out):
+    for i in prange(pm.shape[0]):
+        v = pm[i]
+        if np.isnan(v):
+            out[i] = np.nan
+            continue
+        if v <= 30:
+            aqi = (50 / 30) * v
+        elif v <= 60:
+            aqi = 50 + (50 / 30) * (v - 30)
+        elif v <= 90:
+            aqi = 100 + (100 / 30) * (v - 60)
+        elif v <= 120:
+            aqi = 200 + (100 / 30) * (v - 90)
+        elif v <= 250:
+            aqi = 300 + (100 / 130) * (v - 120)
+        else:
+            aqi = min(400 + (100 / 250) * (v - 250), 500)  # Cap at 500
+        out[i] = round(aqi)
+
+
 def calculate_aqi_pm25(pm25):
-    """Calculate AQI based on PM2.5 concentration (µg/m³) using India's CPCB breakpoints."""
-    if pd.isna(pm25):
-        return np.nan
-    if pm25 <= 30:
-        aqi = (50 / 30) * pm25
-    elif pm25 <= 60:
-        aqi = 50 + (50 / 30) * (pm25 - 30)
-    elif pm25 <= 90:
-        aqi = 100 + (100 / 30) * (pm25 - 60)
-    elif pm25 <= 120:
-        aqi = 200 + (100 / 30) * (pm25 - 90)
-    elif pm25 <= 250:
-        aqi = 300 + (100 / 130) * (pm25 - 120)
-    else:
-        aqi = 400 + (100 / (250)) * (pm25 - 250)
-        aqi = min(aqi, 500)  # Cap at 500
-    return round(aqi)
+    """Calculate AQI from a PM2.5 concentration series (µg/m³) using India's CPCB breakpoints."""
+    x = pm25.to_numpy(dtype=np.float64)
+    out = np.empty_like(x)
+    _aqi_kernel(x, out)
+    return out
+
+
+@njit(cache=True)
+def _interp_nan_linear(y):
+    """Fill NaN runs in-place with linear interpolation, matching pandas 'linear'
+    semantics: leading NaNs stay NaN, trailing NaNs carry the last valid value."""
+    n = y.size
+    i = 0
+    while i < n:
+        if not np.isnan(y[i]):
+            i += 1
+            continue
+        j = i
+        while j < n and np.isnan(y[j]):
+            j += 1
+        if i > 0:
+            if j < n:
+                y0 = y[i - 1]
+                step = (y[j] - y0) / (j - i + 1)
+                for k in range(i, j):
+                    y[k] = y0 + step * (k - i + 1)
+            else:
+                for k in range(i, n):
+                    y[k] = y[i - 1]
+        i = j
 
 def preprocess_data(file_path, station_id):
     logger.info(f"Loading dataset for {station_id}...")
@@ -37,43 +85,56 @@ def preprocess_data(file_path, station_id):
     data = data.rename(columns={'From Date': 'ds', 'PM2.5 (ug/m3)': 'PM2.5'})
 
     # Calculate AQI from PM2.5
-    data['AQI'] = data['PM2.5'].apply(calculate_aqi_pm25)
+    data['AQI'] = calculate_aqi_pm25(data['PM2.5'])
 
     data = data[['ds', 'AQI']].copy()
     data = data.set_index('ds')
     data = data.sort_index()
 
-    # Create a complete hourly index and interpolate missing AQI values
-    full_index = pd.date_range(start=data.index.min(), end=data.index.max(), freq='H')
-    data = data.reindex(full_index)
-    data['AQI'] = data['AQI'].interpolate(method='linear')
-
-    data_daily = data.resample('D').mean().interpolate(method='linear')
+    # Aggregate straight to daily means and interpolate daily gaps only,
+    # skipping the hourly reindex/interpolate pass over the full series
+    daily = data.groupby(pd.Grouper(freq='D'))['AQI'].mean()
+    daily = daily.reindex(pd.date_range(start=daily.index.min(), end=daily.index.max(), freq='D'))
+    values = daily.to_numpy(dtype=np.float64, copy=True)
+    _interp_nan_linear(values)
+    data_daily = pd.DataFrame({'AQI': values}, index=daily.index)
     return data_daily, station_id
 
+def fourier_terms(t, period=365.25, K=5):
+    """Deterministic Fourier regressors for yearly seasonality."""
+    return np.column_stack(
+        [np.sin(2 * np.pi * k * t / period) for k in range(1, K + 1)] +
+        [np.cos(2 * np.pi * k * t / period) for k in range(1, K + 1)])
+
+
 # Step 3: Function to fit SARIMA and forecast
 def fit_and_forecast(data_daily, station_id):
 
     adf_result = adfuller(data_daily['AQI'].dropna())
     logger.info(f"{station_id} ADF Statistic: {adf_result[0]}, p-value: {adf_result[1]}")
 
+    # Weekly-mean history for plotting: 7x fewer vertices per figure
+    hist_plot = data_daily['AQI'].resample('W').mean()
+
     # Plot AQI time series
-    plt.figure(figsize=(12, 6))
-    plt.plot(data_daily.index, data_daily['AQI'], label=f'Daily AQI ({station_id})')
-    plt.title(f'Daily AQI ({station_id})')
-    plt.xlabel('Date')
-    plt.ylabel('AQI')
-    plt.legend()
-    plt.savefig(f'aqi_trend_{station_id}.png')
-    plt.close()
+    trend_ax.clear()
+    trend_ax.plot(hist_plot.index, hist_plot, label=f'Weekly mean AQI ({station_id})')
+    trend_ax.set_title(f'Daily AQI ({station_id})')
+    trend_ax.set_xlabel('Date')
+    trend_ax.set_ylabel('AQI')
+    trend_ax.legend()
+    trend_fig.savefig(f'aqi_trend_{station_id}.png')
 
 
-    # Fit SARIMA model
+    # Fit SARIMA model; yearly seasonality enters as Fourier regressors, which
+    # keeps the state dimension tiny compared to seasonal_order=(1, 1, 1, 365)
     logger.info(f"Fitting SARIMA model for {station_id}...")
+    t = np.arange(len(data_daily))
+    exog = fourier_terms(t)
     model = SARIMAX(
         data_daily['AQI'],
+        exog=exog,
         order=(1, 1, 1),
-        seasonal_order=(1, 1, 1, 365),
         enforce_stationarity=False,
         enforce_invertibility=False
     )
@@ -89,11 +150,19 @@ def fit_and_forecast(data_daily, station_id):
     }
     forecasts = {}
 
-    for horizon_name, days in forecast_horizons.items():
+    # Forecast once at the longest horizon; shorter horizons are prefixes of it
+    max_days = max(forecast_horizons.values())
+    exog_future = fourier_terms(np.arange(len(data_daily), len(data_daily) + max_days))
+    forecast = results.get_forecast(steps=max_days, exog=exog_future)
+    forecast_mean_full = forecast.predicted_mean
+    forecast_ci_full = forecast.conf_int(alpha=0.05)
+
+    # One 2x2 panel figure per station: one subplot per horizon, one savefig
+    for ax, (horizon_name, days) in zip(panel_axes.flat, forecast_horizons.items()):
         logger.info(f"Generating {horizon_name} forecast for {station_id}...")
-        forecast = results.get_forecast(steps=days)
-        forecast_mean = forecast.predicted_mean
-        forecast_ci = forecast.conf_int(alpha=0.05)
+        ax.clear()
+        forecast_mean = forecast_mean_full.iloc[:days]
+        forecast_ci = forecast_ci_full.iloc[:days]
         forecast_df = pd.DataFrame({
             'Date': pd.date_range(start=data_daily.index[-1] + timedelta(days=1), periods=days, freq='D'),
             'AQI_Forecast': forecast_mean,
@@ -102,40 +171,45 @@ def fit_and_forecast(data_daily, station_id):
         })
         forecasts[horizon_name] = forecast_df
 
-        forecast_df.to_csv(f'aqi_forecast_{station_id}_{horizon_name}.csv', index=False)
-
         # Plot forecast
-        plt.figure(figsize=(12, 6))
-        plt.plot(data_daily.index, data_daily['AQI'], label='Historical AQI')
-        plt.plot(forecast_df['Date'], forecast_df['AQI_Forecast'], label=f'Forecast ({horizon_name})')
-        plt.fill_between(
+        ax.plot(hist_plot.index, hist_plot, label='Historical AQI (weekly mean)')
+        ax.plot(forecast_df['Date'], forecast_df['AQI_Forecast'], label=f'Forecast ({horizon_name})')
+        ax.fill_between(
             forecast_df['Date'],
             forecast_df['Lower_CI'],
             forecast_df['Upper_CI'],
             alpha=0.2,
             label='95% Confidence Interval'
         )
-        plt.title(f'AQI Forecast ({station_id} - {horizon_name})')
-        plt.xlabel('Date')
-        plt.ylabel('AQI')
-        plt.legend()
-        plt.savefig(f'aqi_forecast_{station_id}_{horizon_name}.png')
-        plt.close()
+        ax.set_title(f'AQI Forecast ({station_id} - {horizon_name})')
+        ax.set_xlabel('Date')
+        ax.set_ylabel('AQI')
+        ax.legend()
+
+    panel_fig.tight_layout()
+    panel_fig.savefig(f'aqi_forecast_{station_id}.png')
+
+    # One long-format Parquet per station instead of one CSV per horizon
+    all_horizons = pd.concat([df.assign(horizon=h) for h, df in forecasts.items()])
+    all_horizons.to_parquet(f'forecasts_{station_id}.parquet', compression='zstd', index=False)
 
     return forecasts
 
-# Step 4: Process multiple stations
+# Step 4: Process multiple stations in parallel (one worker per station)
 stations = [
     ('AP001.csv', 'AP001'),
     ('AP003.csv', 'AP003')
 ]
-all_forecasts = {}
 
-for file_path, station_id in stations:
+def process_station(file_path, station_id):
     logger.info(f"Processing {station_id}...")
     data_daily, station_id = preprocess_data(file_path, station_id)
-    forecasts, mae, rmse = fit_and_forecast(data_daily, station_id)
-    all_forecasts[station_id] = forecasts
+    return station_id, fit_and_forecast(data_daily, station_id)
+
+results = Parallel(n_jobs=-1, backend='loky')(
+    delayed(process_station)(file_path, station_id) for file_path, station_id in stations
+)
+all_forecasts = dict(results)
 
 # Step 5: Output summary
 print("\n=== AQI Forecast Summary ===")
@@ -144,4 +218,4 @@ for station_id, forecasts in all_forecasts.items():
     for horizon_name, forecast in forecasts.items():
         print(f"\n{horizon_name.replace('_', ' ').title()}:")
         print(forecast[['Date', 'AQI_Forecast', 'Lower_CI', 'Upper_CI']].head(5).to_string(index=False))
-print("\nForecasts saved as CSV files and plots saved as PNG files.")
+print("\nForecasts saved as Parquet files and plots saved as PNG files.")
@@ -1,6 +1,12 @@
+import os
+import pickle
+
 import dimod
+import minorminer
 import numpy as np
-from dwave.system import DWaveSampler, EmbeddingComposite
+from numba import njit, prange
+from dwave.system import DWaveSampler, FixedEmbeddingComposite
+from prune import prune_dominated
 
 
 # Sample player data
@@ -25,48 +31,120 @@ gamma = 100.0  # Positional
 delta = 100.0  # Team size
 
 
-# Initialize QUBO dictionary
+# Drop dominated players before building the model; shrinking N cuts
+# embedding cost quadratically
+players = prune_dominated(players, positional_reqs)
+
+# Build the BQM sparsely: linear objective terms plus equality constraints
+# whose penalty expansions dimod compiles internally
 N = len(players)
-Q = {(i, i): 0.0 for i in range(N)}
-Q.update({(i, j): 0.0 for i in range(N) for j in range(i + 1, N)})
+P = np.array([p[2] for p in players], dtype=np.float64)
+S = np.array([p[3] for p in players], dtype=np.float64)
+
+# All couplings come from rank-1 factors: the salary vector, one membership
+# mask per position, and the all-ones team-size vector (~5N parameters, not N^2)
+pos_masks = {pos: np.array([1.0 if p[1] == pos else 0.0 for p in players])
+             for pos in positional_reqs}
 
-#print(Q)
+# Integer position codes for the compiled dense builder
+pos_list = list(positional_reqs)
+pos_id = np.array([pos_list.index(p[1]) for p in players], dtype=np.int8)
+pos_req = np.array([positional_reqs[pos] for pos in pos_list], dtype=np.float64)
 
-# Points
-for i in range(N):
-        Q[(i, i)] -= alpha * players[i][2]
+# Points: bulk array ingest instead of a per-entry Python dict
+bqm = dimod.BinaryQuadraticModel(vartype='BINARY')
+bqm.add_linear_from_array(-alpha * P)
 
 # Salary or cost constraint
-for i in range(N):
-    Q[(i, i)] += beta * players[i][3] ** 2
-    Q[(i, i)] -= 2 * beta * budget * players[i][3]
-    for j in range(i + 1, N):
-        Q[(i, j)] += 2 * beta * players[i][3] * players[j][3]
+bqm.add_linear_equality_constraint(
+    [(i, S[i]) for i in range(N)], constant=-budget, lagrange_multiplier=beta)
 
 # Positional constraint
 for pos, n_k in positional_reqs.items():
-    for i in range(N):
-        if players[i][1] == pos:
-            Q[(i, i)] += gamma * (1 - 2 * n_k)
-            for j in range(i + 1, N):
-                if players[j][1] == pos:
-                    Q[(i, j)] += 2 * gamma
-
+    bqm.add_linear_equality_constraint(
+        [(int(i), 1.0) for i in np.flatnonzero(pos_masks[pos])],
+        constant=-n_k, lagrange_multiplier=gamma)
 
 # Team size constraint
-for i in range(N):
-    Q[(i, i)] += delta * (1 - 2 * team_size)
-    for j in range(i + 1, N):
-        Q[(i, j)] += 2 * delta
-
-print(Q)
-
-# Solve using D-Wave
-sampler = EmbeddingComposite(DWaveSampler())
-bqm = dimod.BinaryQuadraticModel.from_qubo(Q)
-response = sampler.sample(bqm, num_reads=1000)
+bqm.add_linear_equality_constraint(
+    [(i, 1.0) for i in range(N)], constant=-team_size, lagrange_multiplier=delta)
+
+
+# Dense QUBO matrix with the same energy terms as the BQM, for local solves
+@njit(cache=True, parallel=True)
+def build_qubo_matrix(points, sal, pos_id, pos_req, budget, team_size, a, b, g, d):
+    n = points.size
+    Q_mat = np.zeros((n, n))
+    for i in prange(n):
+        Q_mat[i, i] = (-a * points[i] + b * sal[i] ** 2 - 2 * b * budget * sal[i]
+                       + d * (1 - 2 * team_size) + g * (1 - 2 * pos_req[pos_id[i]]))
+        for j in range(i + 1, n):
+            coup = 2 * b * sal[i] * sal[j] + 2 * d
+            if pos_id[i] == pos_id[j]:
+                coup += 2 * g
+            Q_mat[i, j] = coup
+    return Q_mat
+
+
+@njit(cache=True)
+def gray_brute(Q_mat):
+    """Exact QUBO minimization over all 2^n states in Gray-code order.
+
+    Consecutive Gray codes differ in one bit, so each step updates the
+    energy incrementally in O(n) instead of re-evaluating the quadratic form.
+    """
+    n = Q_mat.shape[0]
+    x = np.zeros(n, dtype=np.uint8)
+    best_x = x.copy()
+    v = 0.0
+    best_v = 0.0
+    for k in range(1, 1 << n):
+        # The bit flipped between Gray codes k-1 and k is the lowest set bit of k
+        i = 0
+        kk = k
+        while kk & 1 == 0:
+            kk >>= 1
+            i += 1
+        # Coupling of bit i to the currently selected bits
+        cross = 0.0
+        for j in range(n):
+            if x[j] and j != i:
+                if j < i:
+                    cross += Q_mat[j, i]
+                else:
+                    cross += Q_mat[i, j]
+        if x[i]:
+            v -= Q_mat[i, i] + cross
+            x[i] = 0
+        else:
+            v += Q_mat[i, i] + cross
+            x[i] = 1
+        if v < best_v:
+            best_v = v
+            best_x = x.copy()
+    return best_v, best_x
+
+
+# Solve: exact brute force locally for small pools, D-Wave otherwise
+if N <= 22:
+    energy, best = gray_brute(build_qubo_matrix(
+        P, S, pos_id, pos_req, budget, team_size, alpha, beta, gamma, delta))
+    best_sample = {i: int(best[i]) for i in range(N)}
+else:
+    # Reuse a cached minor embedding across runs; the minorminer search
+    # dominates wall time when resubmitting the same model shape
+    sampler_hw = DWaveSampler()
+    if os.path.exists('embedding.pkl'):
+        with open('embedding.pkl', 'rb') as f:
+            embedding = pickle.load(f)
+    else:
+        embedding = minorminer.find_embedding(bqm.quadratic, sampler_hw.edgelist)
+        with open('embedding.pkl', 'wb') as f:
+            pickle.dump(embedding, f)
+    sampler = FixedEmbeddingComposite(sampler_hw, embedding)
+    response = sampler.sample(bqm, num_reads=1000)
+    best_sample = response.first.sample
 
-best_sample = response.first.sample
 print(best_sample)
 selected_players = [i for i in range(N) if best_sample[i] == 1]
 
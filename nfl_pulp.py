@@ -1,55 +1,99 @@
-from pulp import LpProblem, LpMaximize, LpVariable, LpStatus, lpSum
+from pulp import LpProblem, LpMaximize, LpVariable, LpStatus, lpSum, PULP_CBC_CMD
+
+from prune import prune_dominated
 
 # Sample player data
 
 players = [(0, 'QB', 50.0, 8000), (1, 'QB', 30.0, 7500),
            (2, 'RB', 25.0, 6000), (3, 'RB', 18.0, 5400), (4, 'RB', 12.0, 5200),
-	   	   (5, 'WR', 16.0, 5800), (6, 'WR', 15.0, 5200), (7, 'WR', 13.0, 4900), (8, 'WR', 9.0, 4500),
-	       (9, 'TE', 12.0, 4000), (10, 'TE', 10.0, 3800),  (11, 'TE', 10.0, 3200),
-	       (12, 'DST', 9.0, 2200), (13, 'DST', 6.0, 1000)]
+           (5, 'WR', 16.0, 5800), (6, 'WR', 15.0, 5200), (7, 'WR', 13.0, 4900), (8, 'WR', 9.0, 4500),
+           (9, 'TE', 12.0, 4000), (10, 'TE', 10.0, 3800),  (11, 'TE', 10.0, 3200),
+           (12, 'DST', 9.0, 2200), (13, 'DST', 6.0, 1000)]
 
 # Problem parameters
 budget = 100000
 team_size = 9
 positional_reqs = {'QB': 1, 'RB': 2, 'WR': 3, 'TE': 2, 'DST': 1}
 
+def greedy_lineup(players, positional_reqs, budget):
+    """Build a feasible lineup greedily: top scorers per position, then swap in
+    cheaper same-position alternatives until the lineup fits the budget."""
+    pos_index = {}
+    for i, p in enumerate(players):
+        pos_index.setdefault(p[1], []).append(i)
+
+    chosen = set()
+    for pos, n_k in positional_reqs.items():
+        ranked = sorted(pos_index[pos], key=lambda i: -players[i][2])
+        chosen.update(ranked[:n_k])
+
+    while sum(players[i][3] for i in chosen) > budget:
+        swap = None
+        for i in sorted(chosen, key=lambda i: players[i][2]):
+            cheaper = [j for j in pos_index[players[i][1]]
+                       if j not in chosen and players[j][3] < players[i][3]]
+            if cheaper:
+                swap = (i, min(cheaper, key=lambda j: players[j][3]))
+                break
+        if swap is None:
+            break
+        chosen.discard(swap[0])
+        chosen.add(swap[1])
+
+    return [1 if i in chosen else 0 for i in range(len(players))]
+
+
+# Drop dominated players before building the model
+players = prune_dominated(players, positional_reqs)
+
+# Precompute columns and per-position index lists
+N = len(players)
+points = [p[2] for p in players]
+sal = [p[3] for p in players]
+by_pos = {}
+for i, p in enumerate(players):
+    by_pos.setdefault(p[1], []).append(i)
+
 # Create PuLP problem
 prob = LpProblem("NFL_Player_Selection", LpMaximize)
 
 # Variables
-x = {i: LpVariable(f"x_{i}", cat='Binary') for i in range(len(players))}
+x = {i: LpVariable(f"x_{i}", cat='Binary') for i in range(N)}
 
 # Objective: Maximize points
-prob += lpSum(players[i][2] * x[i] for i in range(len(players)))
+prob += lpSum(points[i] * x[i] for i in range(N))
 
 # Salary constraint
-prob += lpSum(players[i][3] * x[i] for i in range(len(players))) <= budget
+prob += lpSum(sal[i] * x[i] for i in range(N)) <= budget
 
 # Positional constraints
 for pos, n_k in positional_reqs.items():
-	prob += lpSum(x[i] for i in range(len(players)) if players[i][1] == pos) == n_k
+    prob += lpSum(x[i] for i in by_pos[pos]) == n_k
 
 
 # Team size constraint
-prob += lpSum(x[i] for i in range(len(players))) == team_size
+prob += lpSum(x[i] for i in range(N)) == team_size
+
+# Warm start: seed CBC with a greedy feasible lineup so branch-and-bound
+# starts from a tight incumbent
+initial = greedy_lineup(players, positional_reqs, budget)
+for i, v in enumerate(initial):
+    x[i].setInitialValue(v)
 
-prob.solve()
+prob.solve(PULP_CBC_CMD(warmStart=True, msg=0))
 
 # Output results
 print("Status:", LpStatus[prob.status])
 selected_players = [i for i in range(len(players)) if x[i].value() == 1]
 total_points = sum(players[i][2] for i in selected_players)
 total_salary = sum(players[i][3] for i in selected_players)
-positions_count={}
+positions_count = {}
 
 
 for i in selected_players:
-	pos = players[i][1]
-        if pos in positions_count:
-		positions_count[pos] += 1
-	else:
-		positions_count[pos] = 1
-	print(f"Player {i} ({pos}): Points={players[i][2]}, Salary={players[i][3]}")
+    pos = players[i][1]
+    positions_count[pos] = positions_count.get(pos, 0) + 1
+    print(f"Player {i} ({pos}): Points={players[i][2]}, Salary={players[i][3]}")
 
 print(f"Total Points: {total_points}")
 print(f"Total Salary: {total_salary}")
@@ -0,0 +1,30 @@
+# Dominated-player pruning shared by the D-Wave and PuLP lineup solvers
+
+def prune_dominated(players, positional_reqs):
+    """Drop players that can never appear in an optimal lineup.
+
+    A player is dominated by a same-position alternative with at least as many
+    points and at most the same salary (strictly better in one, with index as
+    tie-break for exact duplicates). Because a lineup may need n_k players at a
+    position, a player is only dropped once at least n_k distinct dominators
+    exist. Survivors are re-indexed 0..M-1.
+    """
+    by_pos = {}
+    for p in players:
+        by_pos.setdefault(p[1], []).append(p)
+
+    survivors = []
+    for pos, group in by_pos.items():
+        n_k = positional_reqs.get(pos, 0)
+        for p in group:
+            dominators = sum(
+                1 for q in group
+                if q is not p and q[2] >= p[2] and q[3] <= p[3]
+                and (q[2] > p[2] or q[3] < p[3] or q[0] < p[0])
+            )
+            if n_k and dominators >= n_k:
+                continue
+            survivors.append(p)
+
+    survivors.sort(key=lambda p: p[0])
+    return [(i, p[1], p[2], p[3]) for i, p in enumerate(survivors)]